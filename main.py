@@ -11,16 +11,24 @@ Commands
 train                   – extract speaker-embedding only
 synthesize              – generate speech from .txt files
 train_and_synthesize    – do both in sequence
+stream                  – read text on stdin, stream 16-bit PCM to stdout
+serve                   – keep models loaded, take JSON-line jobs on stdin
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import logging
 import sys
 from pathlib import Path
 
-from src.trainer import VoiceTrainer
-from src.synthesizer import TextToSpeechSynthesizer
+# NOTE: the src.* modules pull in torch / MeloTTS / OpenVoice (several
+# seconds to import), so each command branch of `main()` imports only the
+# modules it uses, after the arguments are parsed – `--help` and argument
+# errors stay instant and `train` never loads MeloTTS.
+
+logger = logging.getLogger(__name__)
 
 
 def build_argparser() -> argparse.ArgumentParser:
@@ -31,7 +39,7 @@ def build_argparser() -> argparse.ArgumentParser:
     )
     p.add_argument(
         "command",
-        choices=("train", "synthesize", "train_and_synthesize"),
+        choices=("train", "synthesize", "train_and_synthesize", "stream", "serve"),
         help="Action to perform",
     )
 
@@ -48,6 +56,12 @@ def build_argparser() -> argparse.ArgumentParser:
     # TTS options
     p.add_argument("--language", default="EN", type=str,
                    help="TTS language code understood by MeloTTS")
+    p.add_argument("--batch_size", default=4, type=int,
+                   help="Number of texts synthesised per batch")
+    p.add_argument("--compile", action="store_true",
+                   help="torch.compile the vocoders (slow start, faster per-file)")
+    p.add_argument("--onnx", action="store_true",
+                   help="Run the vocoders with ONNX Runtime (CPU only, needs onnxruntime)")
 
     return p
 
@@ -62,20 +76,66 @@ def main() -> None:
     output_dir = Path(args.output_dir).resolve()
 
     if args.command == "train":
+        from src.trainer import VoiceTrainer
+
         VoiceTrainer().train(audio_dir, checkpoint_dir)
 
     elif args.command == "synthesize":
+        from src.synthesizer import TextToSpeechSynthesizer
+
         TextToSpeechSynthesizer(
             checkpoint_dir=checkpoint_dir,
             language=args.language,
-        ).synthesize(text_dir, output_dir)
+            compile_models=args.compile,
+            use_onnx=args.onnx,
+        ).synthesize(text_dir, output_dir, batch_size=args.batch_size)
 
     elif args.command == "train_and_synthesize":
+        from src.synthesizer import TextToSpeechSynthesizer
+        from src.trainer import VoiceTrainer
+
         VoiceTrainer().train(audio_dir, checkpoint_dir)
         TextToSpeechSynthesizer(
             checkpoint_dir=checkpoint_dir,
             language=args.language,
-        ).synthesize(text_dir, output_dir)
+            compile_models=args.compile,
+            use_onnx=args.onnx,
+        ).synthesize(text_dir, output_dir, batch_size=args.batch_size)
+
+    elif args.command == "stream":
+        from src.synthesizer import TextToSpeechSynthesizer
+
+        pcm_out = sys.stdout.buffer
+        # keep library chatter off stdout – it carries the audio
+        with contextlib.redirect_stdout(sys.stderr):
+            synth = TextToSpeechSynthesizer(
+                checkpoint_dir=checkpoint_dir,
+                language=args.language,
+                compile_models=args.compile,
+                use_onnx=args.onnx,
+            )
+            logger.info("📡 Streaming mono 16-bit PCM @ %d Hz", synth.sampling_rate)
+            for chunk in synth.synthesize_stream(sys.stdin.read()):
+                pcm = (chunk.clip(-1.0, 1.0) * 32767).astype("<i2")
+                pcm_out.write(pcm.tobytes())
+                pcm_out.flush()
+
+    elif args.command == "serve":
+        from src.server import StdioServer
+        from src.synthesizer import TextToSpeechSynthesizer
+
+        replies = sys.stdout
+        # keep library chatter off stdout – it carries the replies
+        with contextlib.redirect_stdout(sys.stderr):
+            synth = TextToSpeechSynthesizer(
+                checkpoint_dir=checkpoint_dir,
+                language=args.language,
+                compile_models=args.compile,
+                use_onnx=args.onnx,
+            )
+            StdioServer(
+                synth, sys.stdin, replies, batch_size=args.batch_size
+            ).serve_forever()
 
     else:  # pragma: no cover – argparse guarantees we never land here
         print("Unknown command.", file=sys.stderr)
@@ -0,0 +1,139 @@
+"""
+Long-running synthesis server for VocalTwin.
+
+Keeps a warmed-up `TextToSpeechSynthesizer` resident and takes work as
+JSON lines on stdin, so repeated requests skip the model load / CUDA
+init cost of a fresh `main.py synthesize` run:
+
+    → {"text": "Hello there.", "out": "outputs/hello.wav"}
+    ← {"out": "outputs/hello.wav", "status": "ok"}
+
+Requests that arrive within a short window of each other are coalesced
+into one batched MeloTTS call.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:  # importing the synthesizer loads torch + both models' code
+    from .synthesizer import TextToSpeechSynthesizer
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s"
+)
+
+
+class StdioServer:
+    """Serve `{"text", "out"}` JSON-line requests from *inp*, replying on *out*."""
+
+    def __init__(
+            self,
+            synthesizer: TextToSpeechSynthesizer,
+            inp: IO[str],
+            out: IO[str],
+            batch_size: int = 4,
+            batch_window: float = 0.02,  # seconds to wait for more requests
+    ) -> None:
+        self.synth = synthesizer
+        self.inp = inp
+        self.out = out
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._requests: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def serve_forever(self) -> None:
+        """Process requests until *inp* is closed."""
+        threading.Thread(target=self._read_lines, daemon=True).start()
+        logger.info("🛰️  Ready – send JSON lines {\"text\": ..., \"out\": ...}")
+
+        while True:
+            lines, eof = self._next_batch()
+            jobs = [job for job in map(self._parse, lines) if job is not None]
+            if jobs:
+                self._run(jobs)
+            if eof:
+                break
+
+        logger.info("👋 Input closed – shutting down.")
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    def _read_lines(self) -> None:
+        for line in self.inp:
+            if line.strip():
+                self._requests.put(line)
+        self._requests.put(None)  # EOF
+
+    def _next_batch(self) -> Tuple[List[str], bool]:
+        """Block for one request, then gather more for up to `batch_window`."""
+        first = self._requests.get()
+        if first is None:
+            return [], True
+
+        lines = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(lines) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                line = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if line is None:
+                return lines, True
+            lines.append(line)
+        return lines, False
+
+    def _parse(self, line: str) -> Optional[Tuple[Path, str]]:
+        try:
+            req = json.loads(line)
+            text = str(req["text"]).strip()
+            out = Path(req["out"])
+        except (ValueError, KeyError, TypeError) as exc:
+            self._reply({"status": "error", "error": f"bad request: {exc}"})
+            return None
+        if not text:
+            self._reply({"out": str(out), "status": "error", "error": "empty text"})
+            return None
+        try:
+            out.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            self._reply({"out": str(out), "status": "error", "error": f"bad output path: {exc}"})
+            return None
+        return out, text
+
+    def _run(self, jobs: List[Tuple[Path, str]]) -> None:
+        try:
+            writes = self.synth.synthesize_texts(jobs, batch_size=self.batch_size)
+        except Exception as exc:  # keep serving after a failed batch
+            logger.exception("Batch failed")
+            for out, _ in jobs:
+                self._reply({"out": str(out), "status": "error", "error": str(exc)})
+            return
+        # synthesis succeeded – only the individual writes can still fail
+        for (out, _), write in zip(jobs, writes):
+            exc = write.exception()
+            if exc is None:
+                self._reply({"out": str(out), "status": "ok"})
+            else:
+                logger.error("Writing %s failed: %s", out, exc)
+                self._reply({"out": str(out), "status": "error", "error": str(exc)})
+
+    def _reply(self, msg: dict) -> None:
+        self.out.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        self.out.flush()
@@ -3,23 +3,46 @@ Generate speech from text using a target-speaker embedding previously
 computed by `VoiceTrainer`.  Pipeline:
 
     1.  Use **MeloTTS** to synthesise “base-voice” audio from text.
-    2.  Extract SE (speaker embedding) of that base voice.
+    2.  Extract SE (speaker embedding) of that base voice – once per
+        language / base speaker, cached in the checkpoint directory.
     3.  Use **OpenVoice ToneColorConverter** to swap tone-colour to
         the *target* speaker (your voice).
     4.  Save final audio to `outputs/`.
+
+The base-voice audio never touches the disk: step 3 consumes the
+MeloTTS waveform tensor directly (see `src.utils`).
 """
 
 from __future__ import annotations
 
+import contextlib
 import logging
 import os
-import tempfile
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
 import nltk
+import numpy as np
+import soundfile
 import torch
+from melo import utils as melo_utils
 from melo.api import TTS
-from openvoice import se_extractor
-from openvoice.api import ToneColorConverter
+
+from .utils import (
+    OnnxVocoder,
+    configure_torch,
+    convert_spec,
+    convert_spec_batch,
+    crossfade_concat,
+    extract_se_from_waveform,
+    get_converter,
+    keep_fp32,
+    load_embedding,
+    quantize_dynamic_int8,
+    waveform_to_spec,
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -31,6 +54,47 @@ try:
 except LookupError:
     nltk.download("averaged_perceptron_tagger_eng", quiet=True)
 
+# Short utterance used once per (language, speaker) to derive the base-voice SE
+_CALIBRATION_TEXT = {
+    "EN": "This is a test. The quick brown fox jumps over the lazy dog.",
+    "ES": "Esto es una prueba. El veloz zorro marrón salta sobre el perro perezoso.",
+    "FR": "Ceci est un test. Le rapide renard brun saute par-dessus le chien paresseux.",
+    "ZH": "这是一个测试。敏捷的棕色狐狸跳过了那只懒狗。",
+    "JP": "これはテストです。素早い茶色の狐が怠け者の犬を飛び越えます。",
+    "KR": "이것은 테스트입니다. 빠른 갈색 여우가 게으른 개를 뛰어넘습니다.",
+}
+
+# One-word utterance for the warm-up pass (shapes only, content irrelevant)
+_WARMUP_TEXT = {
+    "EN": "Hello.",
+    "ES": "Hola.",
+    "FR": "Bonjour.",
+    "ZH": "你好。",
+    "JP": "こんにちは。",
+    "KR": "안녕하세요.",
+}
+
+# MeloTTS models (incl. BERT) are slow to load – keep one per
+# (language, device, prep flags); the flags are part of the key because
+# __init__ modifies the models in place according to them
+_TTS_CACHE: Dict[Tuple, TTS] = {}
+# (language, device, prep flags) whose models already ran a warm-up inference
+_WARMED_UP: Set[Tuple] = set()
+
+# Sentence joins: MeloTTS's 50 ms pause, entered / left with a 20 ms fade
+_SENTENCE_GAP_S = 0.05
+_CROSSFADE_S = 0.02
+# Upper bound on sentences per MeloTTS forward pass (bounds activation memory)
+_MAX_SENTENCES_PER_PASS = 16
+
+# One MeloTTS pass: (sentence indices, padded audio, valid lengths)
+_Pass = Tuple[List[int], torch.Tensor, torch.Tensor]
+# (output paths, sentences per file, trimmed base audio per sentence – the
+#  last pass still untrimmed, CUDA event marking TTS done)
+_Staged = Tuple[
+    List[Path], List[int], List[Optional[torch.Tensor]], _Pass, Optional[torch.cuda.Event]
+]
+
 
 class TextToSpeechSynthesizer:
     """
@@ -44,6 +108,12 @@ class TextToSpeechSynthesizer:
             language: str = "EN",
             device: str | None = None,
             base_speaker_id: int = 0,  # default neutral voice in each MeloTTS model
+            # int8 dynamic quantization on CPU – a no-op on the shipped MeloTTS /
+            # OpenVoice checkpoints, which are conv-only outside the speaker
+            # encoders; kept for checkpoints with Linear / RNN-heavy layers
+            cpu_int8: bool = False,
+            compile_models: bool = False,  # torch.compile the HiFi-GAN vocoders
+            use_onnx: bool = False,  # ONNX Runtime vocoders (CPU only)
     ) -> None:
         # ── paths ─────────────────────────────────────────────────────────
         self.checkpoint_dir = Path(checkpoint_dir)
@@ -52,10 +122,14 @@ class TextToSpeechSynthesizer:
             device if device is not None else ("cuda:0" if torch.cuda.is_available() else "cpu")
         )
 
+        # ── model preparation flags (int8 / ONNX only take effect on CPU) ──
+        on_cpu = self.device == "cpu"
+        prep = (on_cpu and cpu_int8, on_cpu and use_onnx, compile_models)
+
         # ── OpenVoice tone-colour converter ───────────────────────────────
-        conv_dir = Path("checkpoints_v2/converter")
-        self.converter = ToneColorConverter(str(conv_dir / "config.json"), device=self.device)
-        self.converter.load_ckpt(str(conv_dir / "checkpoint.pth"))
+        self.converter = get_converter(
+            Path("checkpoints_v2/converter"), self.device, variant=("synth",) + prep
+        )
 
         # ── target-speaker embedding ──────────────────────────────────────
         tgt_path = self.checkpoint_dir / "target_se.pth"
@@ -63,12 +137,68 @@ class TextToSpeechSynthesizer:
             raise FileNotFoundError(
                 f"{tgt_path} not found – run `main.py train` first."
             )
-        self.target_se = torch.load(tgt_path, map_location=self.device)["se"]
+        self.target_se = load_embedding(tgt_path, self.device)
+        # contiguous copies broadcast to each converter batch size seen so far
+        self._tgt_se_cache: Dict[int, torch.Tensor] = {1: self.target_se}
         logger.info("🎯 Loaded target speaker embedding from %s", tgt_path)
 
         # ── MeloTTS initialisation ────────────────────────────────────────
-        self.tts = TTS(language=self.language, device=self.device)
+        key = (self.language, self.device) + prep
+        if key not in _TTS_CACHE:
+            _TTS_CACHE[key] = TTS(language=self.language, device=self.device)
+        self.tts = _TTS_CACHE[key]
         self.base_speaker_id = base_speaker_id  # always an *int*
+
+        # ── inference-only setup ──────────────────────────────────────────
+        self.tts.model.eval()
+        self.converter.model.eval()
+        configure_torch(self.device)
+        if self.device == "cpu" and cpu_int8:
+            # speaker / style conditioning (emb_g, ref_enc, spk_emb_linear)
+            # stays fp32; the rest is mostly Conv1d, which this does not cover
+            n_int8 = quantize_dynamic_int8(
+                self.tts.model, skip=("emb_g", "ref_enc", "spk_emb_linear")
+            ) + quantize_dynamic_int8(self.converter.model, skip=("ref_enc",))
+            if n_int8:
+                logger.info("🗜️  Quantized %d Linear / RNN layers to int8 for CPU inference", n_int8)
+            else:
+                logger.info("🗜️  No int8-quantizable layers outside the speaker encoders – staying fp32")
+        if use_onnx:
+            if self.device == "cpu":
+                self._use_onnx_vocoders()
+            else:
+                logger.warning("use_onnx only applies on CPU – keeping PyTorch vocoders.")
+        # vocoder output layers + reference encoder stay fp32 under autocast
+        for model in (self.tts.model, self.converter.model):
+            if not isinstance(model.dec, OnnxVocoder):
+                keep_fp32(model.dec.conv_post)
+        keep_fp32(self.converter.model.ref_enc)
+        if compile_models:
+            self._compile_vocoders()
+        # separate streams let conversion of batch i overlap the tail of the
+        # TTS work for batch i+1
+        self.stream_tts: Optional[torch.cuda.Stream] = None
+        self.stream_conv: Optional[torch.cuda.Stream] = None
+        if self.device.startswith("cuda"):
+            self.stream_tts = torch.cuda.Stream(device=self.device)
+            self.stream_conv = torch.cuda.Stream(device=self.device)
+
+        # ── base-voice embedding (fixed for this language / speaker) ──────
+        self.src_se = self._load_base_se()
+        if self.stream_tts is not None:
+            # both embeddings were uploaded (non_blocking) on the default
+            # stream – order them before anything the side streams run
+            current = torch.cuda.current_stream(self.device)
+            self.stream_tts.wait_stream(current)
+            self.stream_conv.wait_stream(current)
+
+        # first call pays cuDNN autotune / compile cost – do it here, not on
+        # the first real file; plain CPU runs have neither, so skip it there
+        needs_warmup = compile_models or self.device.startswith("cuda")
+        if needs_warmup and key not in _WARMED_UP:
+            self._warmup()
+            _WARMED_UP.add(key)
+
         logger.debug(
             "TextToSpeechSynthesizer ready (lang=%s | device=%s | base_speaker_id=%d)",
             self.language,
@@ -80,59 +210,427 @@ class TextToSpeechSynthesizer:
     # Public API
     # ======================================================================
 
-    def synthesize(self, text_dir: os.PathLike, output_dir: os.PathLike) -> None:
-        """Generate WAVs for every .txt in `text_dir`."""
+    def synthesize(
+            self,
+            text_dir: os.PathLike,
+            output_dir: os.PathLike,
+            batch_size: int = 4,
+    ) -> None:
+        """
+        Generate WAVs for every .txt in `text_dir`.
+
+        Texts are pushed through MeloTTS `batch_size` files at a time, their
+        sentences in padded forward passes of up to `_MAX_SENTENCES_PER_PASS`
+        each, so the encoder/decoder run a few times per batch instead of
+        once per sentence.  All texts are read up front in parallel and
+        finished WAVs are written in a background thread while the next batch
+        is on the models.  On CUDA, MeloTTS and conversion run on separate
+        streams, but MeloTTS blocks the host on every pass (see `_tts_batch`),
+        so only the last pass of batch i+1 overlaps the conversion of batch i.
+        """
         text_dir = Path(text_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        txt_files = [p for p in text_dir.rglob("*.txt") if p.is_file()]
+        txt_files = self._collect_txts(text_dir)
         if not txt_files:
-            logger.error("No .txt files found in %s – nothing to synthesise.", text_dir)
+            logger.error("No non-empty .txt files in %s – nothing to synthesise.", text_dir)
             return
 
         logger.info("📝 Found %d text files – starting synthesis …", len(txt_files))
-        for tf in txt_files:
-            self._process_one(tf, output_dir)
+        jobs = [
+            (output_dir / txt_path.with_suffix(".wav").name, text)
+            for txt_path, text in self._read_texts(txt_files)
+        ]
+        for write in self.synthesize_texts(jobs, batch_size=batch_size):
+            write.result()  # re-raise any write error
 
         logger.info("✅ All done – audio written to %s", output_dir.resolve())
 
+    def synthesize_texts(
+            self,
+            jobs: List[Tuple[Path, str]],
+            batch_size: int = 4,
+    ) -> List[Future]:
+        """
+        Synthesise `(output_wav, text)` pairs; returns once every WAV is on
+        disk.  Same batched / pipelined path as `synthesize()`.
+
+        Returns the finished write of each job, in job order – its
+        `result()` re-raises that job's write error, if any.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        writes: List[Future] = []
+        with ThreadPoolExecutor(max_workers=batch_size) as writer:
+            pending = None
+            for start in range(0, len(jobs), batch_size):
+                staged = self._tts_stage(jobs[start:start + batch_size])
+                writes += self._convert_stage(pending, writer)
+                pending = staged
+            writes += self._convert_stage(pending, writer)
+        return writes
+
+    def synthesize_stream(
+            self,
+            text: str,
+            window: int = 50,
+            overlap: int = 10,
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield converted audio for *text* chunk by chunk, as soon as each
+        chunk is ready (sample rate: `self.sampling_rate`).
+
+        MeloTTS runs one sentence at a time; each sentence's spectrogram is
+        then tone-colour converted in windows of `window` frames that
+        overlap by `overlap` frames and are crossfaded together.
+
+        The chunks are shorter than an OpenVoice watermark block, so unlike
+        `synthesize()` the streamed audio is not watermarked.
+        """
+        if not 0 <= overlap < window:
+            raise ValueError(f"need 0 <= overlap < window, got {overlap}, {window}")
+
+        tts_sr = self.tts.hps.data.sampling_rate
+        hop = self.converter.hps.data.hop_length
+        fade = overlap * hop
+        sentence_fade = int(self.sampling_rate * _CROSSFADE_S)
+        sentence_gap = int(self.sampling_rate * _SENTENCE_GAP_S)
+
+        sentences = self.tts.split_sentences_into_pieces(
+            text, self.tts.language, quiet=True
+        )
+        tail: Optional[torch.Tensor] = None  # last `fade` samples, not yet yielded
+        # inference / autocast modes are thread-local, so they are only held
+        # around the model calls – never across a `yield` into caller code
+        for sentence in sentences:
+            with torch.inference_mode(), self._amp_ctx():
+                audio, lengths = self._tts_batch([sentence])
+                spec = waveform_to_spec(self.converter, audio[0, :int(lengths[0])], tts_sr)
+
+            n_frames = spec.size(-1)
+            start = 0
+            while True:
+                end = min(start + window, n_frames)
+                with torch.inference_mode(), self._amp_ctx():
+                    out = convert_spec(
+                        self.converter, spec[..., start:end], self.src_se, self.target_se
+                    )
+                    if tail is not None:
+                        out = (
+                            crossfade_concat([tail, out], fade)
+                            if start > 0
+                            else crossfade_concat([tail, out], sentence_fade, sentence_gap)
+                        )
+                    cut = max(out.numel() - fade, 0)
+                    chunk = out[:cut].cpu().numpy() if cut else None
+                    tail = out[cut:]
+                if chunk is not None:
+                    yield chunk
+                if end == n_frames:
+                    break
+                start += window - overlap
+
+        if tail is not None and tail.numel():
+            yield tail.cpu().numpy()
+
+    @property
+    def sampling_rate(self) -> int:
+        """Sample rate of the audio this synthesizer produces."""
+        return self.converter.hps.data.sampling_rate
+
     # ======================================================================
     # Internal helpers
     # ======================================================================
 
-    def _process_one(self, txt_path: Path, out_dir: Path) -> None:
-        text = txt_path.read_text(encoding="utf-8").strip()
-        if not text:
-            logger.warning("⚠️  %s is empty – skipping.", txt_path.name)
+    def _amp_ctx(self) -> contextlib.AbstractContextManager:
+        """fp16 autocast on CUDA, no-op elsewhere."""
+        if self.device.startswith("cuda"):
+            return torch.autocast(device_type="cuda", dtype=torch.float16)
+        return contextlib.nullcontext()
+
+    def _compile_vocoders(self) -> None:
+        """
+        `torch.compile` the HiFi-GAN decoders of MeloTTS and the converter –
+        the dominant per-utterance cost.  Input lengths vary per text, so
+        shapes are marked dynamic instead of using CUDA-graph
+        ("reduce-overhead") mode, which would re-capture for every length.
+        """
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile unavailable (torch < 2.0) – running eager.")
             return
+        for model in (self.tts.model, self.converter.model):
+            if not isinstance(model.dec, OnnxVocoder) and not hasattr(model.dec, "_orig_mod"):
+                model.dec = torch.compile(model.dec, dynamic=True)
+        logger.info("⚙️  Compiled vocoders with torch.compile")
 
-        logger.info("🔊 Synthesising %s …", txt_path.name)
+    def _use_onnx_vocoders(self) -> None:
+        """
+        Swap the HiFi-GAN decoders – the heaviest ops on CPU – for ONNX
+        Runtime sessions.  Graphs are exported once under
+        `checkpoint_dir/onnx/` and reused on later runs.
+        """
+        onnx_dir = self.checkpoint_dir / "onnx"
+        targets = (
+            (self.tts.model, onnx_dir / f"melo_{self.language}_dec.onnx"),
+            (self.converter.model, onnx_dir / "converter_dec.onnx"),
+        )
+        for model, onnx_path in targets:
+            if isinstance(model.dec, OnnxVocoder):
+                continue
+            if not onnx_path.exists():
+                logger.info("📦 Exporting vocoder to %s …", onnx_path)
+                OnnxVocoder.export(model.dec, onnx_path)
+            model.dec = OnnxVocoder(onnx_path)
+        logger.info("🧮 Using ONNX Runtime vocoders")
+
+    def _warmup(self) -> None:
+        """
+        Push a one-word batch of 2 through the batched TTS / conversion path,
+        so dynamic-shape compilation does not specialise on batch size 1.
+        """
+        text = _WARMUP_TEXT.get(self.language.split("_")[0], _WARMUP_TEXT["EN"])
+        tts_sr = self.tts.hps.data.sampling_rate
+        with torch.inference_mode(), self._amp_ctx():
+            audio, lengths = self._tts_batch([text, text])
+            specs = [
+                waveform_to_spec(self.converter, wav[:n], tts_sr)
+                for wav, n in zip(audio, lengths.tolist())
+            ]
+            convert_spec_batch(
+                self.converter, specs, self.src_se, self._target_se_for(len(specs))
+            )
+        logger.debug("Warm-up inference done")
+
+    def _load_base_se(self) -> torch.Tensor:
+        """
+        Return the SE of the MeloTTS base speaker.
+
+        It only depends on (language, base_speaker_id), so it is computed
+        once from a calibration utterance and memoised under
+        `checkpoint_dir` – later runs just load it.
+        """
+        se_path = (
+            self.checkpoint_dir / f"base_se_{self.language}_{self.base_speaker_id}.pth"
+        )
+        if se_path.exists():
+            logger.info("🎙️  Loaded base speaker embedding from %s", se_path)
+            return load_embedding(se_path, self.device)
+
+        # MeloTTS output is clean synthetic speech – no VAD / segmentation
+        # pass needed, the SE is taken from the full in-memory waveform.
+        text = _CALIBRATION_TEXT.get(self.language.split("_")[0], _CALIBRATION_TEXT["EN"])
+        audio = self.tts.tts_to_file(
+            text=text,
+            speaker_id=self.base_speaker_id,
+            output_path=None,
+            quiet=True,
+        )
+        src_se = extract_se_from_waveform(
+            self.converter,
+            torch.from_numpy(audio),
+            self.tts.hps.data.sampling_rate,
+        )
+
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        torch.save({"se": src_se.cpu()}, se_path)
+        logger.info("🎙️  Base speaker embedding saved to %s", se_path)
+        return src_se
+
+    @staticmethod
+    def _collect_txts(root: Path) -> List[Path]:
+        """Recursively gather non-empty *.txt files."""
+        return [p for p in root.rglob("*.txt") if p.is_file() and p.stat().st_size > 0]
+
+    @staticmethod
+    def _read_texts(txt_paths: List[Path]) -> List[Tuple[Path, str]]:
+        """Read and strip all files in parallel, dropping whitespace-only ones."""
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            texts = pool.map(lambda p: p.read_text(encoding="utf-8").strip(), txt_paths)
+            items = []
+            for txt_path, text in zip(txt_paths, texts):
+                if not text:
+                    logger.warning("⚠️  %s is empty – skipping.", txt_path.name)
+                    continue
+                items.append((txt_path, text))
+        return items
+
+    def _on_stream(
+            self, stream: Optional[torch.cuda.Stream]
+    ) -> contextlib.AbstractContextManager:
+        return torch.cuda.stream(stream) if stream is not None else contextlib.nullcontext()
+
+    def _tts_stage(self, items: List[Tuple[Path, str]]) -> Optional[_Staged]:
+        """
+        Queue MeloTTS for one batch on `stream_tts`.
+
+        Every file is split into sentences up front; the sentences of the
+        batch are sorted by length (less padding) and run in passes of at most
+        `_MAX_SENTENCES_PER_PASS`.  Each pass is trimmed to its valid lengths
+        once the next one has synced the host, so only unpadded per-sentence
+        audio (plus the last, still queued pass) is kept around.
+        """
+        if not items:
+            return None
+        paths = [p for p, _ in items]
+        logger.info("🔊 Synthesising %s …", ", ".join(p.stem for p in paths))
+
+        sentences, counts = [], []
+        for _, text in items:
+            pieces = self.tts.split_sentences_into_pieces(
+                text, self.tts.language, quiet=True
+            )
+            sentences += pieces
+            counts.append(len(pieces))
+
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        with torch.inference_mode(), self._amp_ctx(), self._on_stream(self.stream_tts):
+            audio: List[Optional[torch.Tensor]] = [None] * len(sentences)
+            last: Optional[_Pass] = None
+            for start in range(0, len(order), _MAX_SENTENCES_PER_PASS):
+                idx = order[start:start + _MAX_SENTENCES_PER_PASS]
+                padded, lengths = self._tts_batch([sentences[i] for i in idx])
+                # this pass synced the host mid-way, so the previous one is done
+                if last is not None:
+                    self._trim_into(audio, *last)
+                last = (idx, padded, lengths)
+            done = None
+            if self.stream_tts is not None:
+                done = torch.cuda.Event()
+                done.record(self.stream_tts)
+        return paths, counts, audio, last, done
+
+    def _convert_stage(
+            self,
+            staged: Optional[_Staged],
+            writer: ThreadPoolExecutor,
+    ) -> List[Future]:
+        """Tone-colour convert one batch on `stream_conv`; writes go to *writer*."""
+        if staged is None:
+            return []
+        paths, counts, sentences, last, done = staged
+        tts_sr = self.tts.hps.data.sampling_rate
+        out_sr = self.converter.hps.data.sampling_rate
+        gap, overlap = int(tts_sr * _SENTENCE_GAP_S), int(tts_sr * _CROSSFADE_S)
 
-        with tempfile.TemporaryDirectory() as tmp:
-            base_wav = Path(tmp) / "base.wav"
+        writes = []
+        with torch.inference_mode(), self._amp_ctx(), self._on_stream(self.stream_conv):
+            if self.stream_conv is not None:
+                self.stream_conv.wait_event(done)
+                for t in last[1:]:
+                    t.record_stream(self.stream_conv)
+                for wav in sentences:
+                    if wav is not None:
+                        wav.record_stream(self.stream_conv)
 
-            # 1) Generate base voice
-            self.tts.tts_to_file(
-                text=text,
-                speaker_id=self.base_speaker_id,  # ← single int, per new API
-                output_path=str(base_wav),
+            # stage-by-stage over the whole batch rather than file-by-file:
+            # 1) per-file base waveforms from the sentence outputs
+            self._trim_into(sentences, *last)
+            bounds = np.cumsum([0] + counts)
+            wavs = [
+                crossfade_concat(sentences[a:b], overlap, gap)
+                for a, b in zip(bounds[:-1], bounds[1:])
+            ]
+            # 2) one spectrogram each, 3) a single batched conversion
+            #    (base SE is precomputed, so this is the only converter call)
+            specs = [waveform_to_spec(self.converter, w, tts_sr) for w in wavs]
+            converted = convert_spec_batch(
+                self.converter, specs, self.src_se, self._target_se_for(len(specs))
             )
+            # 4) watermark + write in the background
+            for final_wav, out in zip(paths, converted):
+                writes.append(
+                    writer.submit(self._write_wav, final_wav, out.cpu().numpy(), out_sr)
+                )
+                logger.debug("   ↳ queued %s", final_wav.name)
+        return writes
+
+    @staticmethod
+    def _trim_into(
+            audio: List[Optional[torch.Tensor]],
+            idx: List[int],
+            padded: torch.Tensor,
+            lengths: torch.Tensor,
+    ) -> None:
+        """Store each waveform of a padded pass, unpadded, at its index in *audio*."""
+        for i, wav, n in zip(idx, padded, lengths.tolist()):
+            audio[i] = wav[:n].clone()  # copy, so the padded batch can be freed
+
+    def _target_se_for(self, n: int) -> torch.Tensor:
+        """`target_se` expanded to batch size *n* (built once per size)."""
+        if n not in self._tgt_se_cache:
+            self._tgt_se_cache[n] = self.target_se.expand(n, -1, -1).contiguous()
+        return self._tgt_se_cache[n]
+
+    def _write_wav(self, path: Path, audio: np.ndarray, sr: int) -> None:
+        soundfile.write(str(path), self.converter.add_watermark(audio, "default"), sr)
 
-            # 2) Extract SE of base voice
-            src_se, _ = se_extractor.get_se(
-                str(base_wav),
-                self.converter,
-                vad=True,
+    def _tts_batch(
+            self,
+            texts: List[str],
+            sdp_ratio: float = 0.2,
+            noise_scale: float = 0.6,
+            noise_scale_w: float = 0.8,
+            speed: float = 1.0,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Run MeloTTS on several texts at once.
+
+        Mirrors `TTS.tts_to_file`, but phonemises each text separately,
+        right-pads the token / BERT tensors to the longest one and calls
+        `model.infer` once on the resulting `(B, T)` batch.
+
+        Returns the padded `(B, T_audio)` waveforms plus their valid
+        lengths, both on `self.device`.  This is *not* asynchronous: MeloTTS
+        syncs the host on every call (`get_text_for_tts_infer` moves the BERT
+        features to the CPU and `infer` sizes its output mask with
+        `y_lengths.max()`), so only the flow / decoder tail is left queued on
+        the GPU when it returns.
+        """
+        language = self.tts.language
+        device = self.device
+
+        feats = []
+        for text in texts:
+            if language in ("EN", "ZH_MIX_EN"):
+                text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+            feats.append(
+                melo_utils.get_text_for_tts_infer(
+                    text, language, self.tts.hps, device, self.tts.symbol_to_id
+                )
             )
 
-            # 3) Tone-colour conversion
-            final_wav = out_dir / txt_path.with_suffix(".wav").name
-            self.converter.convert(
-                audio_src_path=str(base_wav),
-                src_se=src_se,
-                tgt_se=self.target_se,
-                output_path=str(final_wav),
+        lengths = torch.LongTensor([phones.size(0) for _, _, phones, _, _ in feats])
+        max_len = int(lengths.max())
+
+        def pad(t: torch.Tensor) -> torch.Tensor:
+            return torch.nn.functional.pad(t, (0, max_len - t.size(-1)))
+
+        bert = torch.stack([pad(f[0]) for f in feats]).to(device)
+        ja_bert = torch.stack([pad(f[1]) for f in feats]).to(device)
+        phones = torch.stack([pad(f[2]) for f in feats]).to(device)
+        tones = torch.stack([pad(f[3]) for f in feats]).to(device)
+        lang_ids = torch.stack([pad(f[4]) for f in feats]).to(device)
+        speakers = torch.full(
+            (len(texts),), self.base_speaker_id, dtype=torch.long, device=device
+        )
+
+        with torch.no_grad():
+            audio, _, y_mask, _ = self.tts.model.infer(
+                phones,
+                lengths.to(device),
+                speakers,
+                tones,
+                lang_ids,
+                bert,
+                ja_bert,
+                sdp_ratio=sdp_ratio,
+                noise_scale=noise_scale,
+                noise_scale_w=noise_scale_w,
+                length_scale=1.0 / speed,
             )
 
-        logger.debug("   ↳ saved %s", final_wav.name)
+        hop = self.tts.hps.data.hop_length
+        audio_lengths = y_mask.sum(dim=(1, 2)).long() * hop
+        return audio[:, 0].float(), audio_lengths
@@ -28,7 +28,8 @@ from typing import List
 
 import torch
 from openvoice import se_extractor
-from openvoice.api import ToneColorConverter
+
+from .utils import get_converter
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -61,8 +62,7 @@ class VoiceTrainer:
                 f"{self.ckpt_converter_dir}.  Download them first."
             )
 
-        self.converter = ToneColorConverter(str(config_path), device=self.device)
-        self.converter.load_ckpt(str(pth_path))
+        self.converter = get_converter(self.ckpt_converter_dir, self.device)
 
         logger.debug(
             "VoiceTrainer initialised (device=%s, ckpt_converter_dir=%s)",
@@ -0,0 +1,370 @@
+"""
+Shared helpers for VocalTwin.
+
+* In-memory counterparts of the OpenVoice `ToneColorConverter` entry
+  points: they take a waveform tensor instead of a file path, so base
+  audio produced by MeloTTS never has to be written to / read from disk.
+* Checkpoint / converter loading (memory-mapped, cached per process).
+* Inference tweaks applied to the loaded models: fp32 islands under
+  autocast, int8 dynamic quantization, ONNX Runtime vocoders and
+  backend / thread tuning.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+import torch
+import torchaudio.functional as AF
+from openvoice.api import ToneColorConverter
+from openvoice.mel_processing import spectrogram_torch
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+# Loaded converters, keyed by (checkpoint dir, device, variant) – shared by
+# every caller in the process that asks for the same variant.
+_CONVERTER_CACHE: Dict[Tuple[str, str, Hashable], ToneColorConverter] = {}
+
+
+def load_checkpoint(path: os.PathLike) -> dict:
+    """
+    `torch.load` *path* onto the CPU, memory-mapped and tensors-only where
+    the file allows it (zip format, plain containers), so nothing is
+    unpickled or copied until it is actually used.
+    """
+    try:
+        return torch.load(path, map_location="cpu", weights_only=True, mmap=True)
+    except (RuntimeError, TypeError, pickle.UnpicklingError):
+        # torch < 2.1, legacy (non-zip) file or non-tensor payload; these are
+        # our own local checkpoints, so a full unpickle is fine (and must be
+        # asked for explicitly – torch >= 2.6 defaults to weights_only=True)
+        return torch.load(path, map_location="cpu", weights_only=False)
+
+
+def load_embedding(path: os.PathLike, device: str) -> torch.Tensor:
+    """Load the `{"se": tensor}` checkpoint at *path* onto *device*."""
+    # ~1 KB: copy it out of the mmap so the file is not held open – `train`
+    # rewrites target_se.pth in place while a `serve` process may be running
+    se = load_checkpoint(path)["se"].clone()
+    if torch.device(device).type == "cuda":
+        se = se.pin_memory()
+    return se.to(device, non_blocking=True)
+
+
+def load_converter_ckpt(converter: ToneColorConverter, path: os.PathLike) -> None:
+    """Like `ToneColorConverter.load_ckpt`, but via `load_checkpoint`."""
+    state = load_checkpoint(path)["model"]
+    missing, unexpected = converter.model.load_state_dict(state, strict=False)
+    logger.debug(
+        "Loaded converter checkpoint %s (missing=%s, unexpected=%s)",
+        path,
+        missing,
+        unexpected,
+    )
+
+
+def _to_fp32(x):
+    return x.float() if torch.is_tensor(x) and x.is_floating_point() else x
+
+
+def _cpu_threads() -> int:
+    """
+    Intra-op thread count for CPU inference: one per physical core of the
+    CPUs this process may run on (assumes 2-way SMT).
+    """
+    try:
+        n = len(os.sched_getaffinity(0))  # honours container / taskset limits
+    except AttributeError:  # not available on macOS / Windows
+        n = os.cpu_count() or 2
+    return max(1, n // 2)
+
+
+def configure_torch(device: str) -> None:
+    """
+    Process-wide backend tuning for inference on *device*.
+
+    CPU: one intra-op thread per physical core (assumes 2-way SMT) and half
+    that for inter-op, so OpenMP does not oversubscribe hyper-threads.
+    CUDA: cuDNN autotuning and TF32 matmuls / convolutions.
+    """
+    if torch.device(device).type == "cuda":
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        return
+
+    n = _cpu_threads()
+    torch.set_num_threads(n)
+    try:
+        torch.set_num_interop_threads(max(1, n // 2))
+    except RuntimeError:
+        # only settable once, before any inter-op work has started
+        logger.debug("Inter-op thread count already fixed – leaving it as is")
+
+
+def get_converter(
+        ckpt_dir: os.PathLike,
+        device: str,
+        variant: Hashable = None,
+) -> ToneColorConverter:
+    """
+    Load the OpenVoice converter in *ckpt_dir* on *device*, or reuse it.
+
+    Callers that modify the model in place (quantization, vocoder swaps,
+    compilation) pass a *variant* describing those changes, so they get
+    their own instance instead of altering the one other callers share.
+    """
+    ckpt_dir = Path(ckpt_dir)
+    key = (str(ckpt_dir.resolve()), device, variant)
+    if key not in _CONVERTER_CACHE:
+        converter = ToneColorConverter(str(ckpt_dir / "config.json"), device=device)
+        load_converter_ckpt(converter, ckpt_dir / "checkpoint.pth")
+        _CONVERTER_CACHE[key] = converter
+    return _CONVERTER_CACHE[key]
+
+
+class OnnxVocoder(nn.Module):
+    """
+    Drop-in replacement for a HiFi-GAN `Generator` (`forward(x, g)`) that
+    runs an exported ONNX graph on the ONNX Runtime CPU provider.
+    """
+
+    def __init__(self, onnx_path: os.PathLike) -> None:
+        super().__init__()
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # optional dependency
+            raise ImportError(
+                "ONNX inference needs onnxruntime – `pip install onnxruntime`."
+            ) from exc
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = _cpu_threads()  # same budget as torch
+        self.session = ort.InferenceSession(
+            str(onnx_path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+
+    @staticmethod
+    def export(dec: nn.Module, onnx_path: os.PathLike) -> None:
+        """Export *dec* with dynamic batch / frame axes."""
+        x = torch.randn(1, dec.conv_pre.in_channels, 32)
+        g = torch.randn(1, dec.cond.in_channels, 1)
+        Path(onnx_path).parent.mkdir(parents=True, exist_ok=True)
+        # newer torch defaults to the dynamo exporter, which needs onnxscript –
+        # stay on the TorchScript one so onnxruntime is the only extra dependency
+        kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            kwargs["dynamo"] = False
+        with torch.no_grad():
+            torch.onnx.export(
+                dec,
+                (x, g),
+                str(onnx_path),
+                input_names=["x", "g"],
+                output_names=["audio"],
+                dynamic_axes={
+                    "x": {0: "batch", 2: "frames"},
+                    "g": {0: "batch"},
+                    "audio": {0: "batch", 2: "samples"},
+                },
+                opset_version=17,
+                **kwargs,
+            )
+
+    def forward(self, x: torch.Tensor, g: torch.Tensor) -> torch.Tensor:
+        g = g.expand(x.size(0), -1, -1)
+        (audio,) = self.session.run(
+            None,
+            {
+                "x": x.detach().float().cpu().numpy(),
+                "g": g.detach().float().cpu().numpy(),
+            },
+        )
+        return torch.from_numpy(audio)
+
+
+def keep_fp32(module: torch.nn.Module) -> torch.nn.Module:
+    """
+    Make *module* run in fp32 even inside an autocast region.
+
+    Used for numerically sensitive layers (vocoder output conv, reference
+    encoder) so fp16 autocast elsewhere does not cost audio quality.
+    """
+    if getattr(module, "_keep_fp32", False):
+        return module
+
+    forward = module.forward
+    device_type = next(module.parameters()).device.type
+
+    @functools.wraps(forward)
+    def fp32_forward(*args, **kwargs):
+        args = tuple(_to_fp32(a) for a in args)
+        kwargs = {k: _to_fp32(v) for k, v in kwargs.items()}
+        with torch.autocast(device_type=device_type, enabled=False):
+            return forward(*args, **kwargs)
+
+    module.forward = fp32_forward
+    module._keep_fp32 = True
+    return module
+
+
+def crossfade_concat(
+        chunks: List[torch.Tensor],
+        overlap: int,
+        gap: int = 0,
+) -> torch.Tensor:
+    """
+    Join 1-D waveforms, linearly crossfading *overlap* samples at each seam.
+
+    With *gap* > 0 a run of silence is placed between chunks instead, so
+    each chunk fades out into / in from the silence rather than clicking.
+    """
+    if gap > 0:
+        silence = chunks[0].new_zeros(gap + 2 * overlap)
+        spaced = [chunks[0]]
+        for c in chunks[1:]:
+            spaced += [silence, c]
+        chunks = spaced
+
+    pieces = [chunks[0]]
+    for nxt in chunks[1:]:
+        prev = pieces.pop()
+        n = min(overlap, prev.numel(), nxt.numel())
+        fade = torch.linspace(0.0, 1.0, n, device=prev.device, dtype=prev.dtype)
+        cut = prev.numel() - n
+        pieces += [prev[:cut], prev[cut:] * (1.0 - fade) + nxt[:n] * fade, nxt[n:]]
+    return torch.cat(pieces)
+
+
+def quantize_dynamic_int8(
+        model: nn.Module,
+        skip: Iterable[str] = (),
+) -> int:
+    """
+    Dynamically quantize the Linear / LSTM / GRU layers of *model* to int8
+    (CPU only), in place.
+
+    Layers inside a submodule named in *skip* (at any depth, e.g. speaker /
+    style encoders and projections) are left in fp32.  Returns how many
+    layers were swapped – 0 for conv-only models, which are left untouched.
+    Calling it again on the same model just returns the first count.
+    """
+    if hasattr(model, "_int8_layers"):
+        return model._int8_layers
+
+    skip = set(skip)
+    targets = {
+        name
+        for name, module in model.named_modules()
+        if isinstance(module, (nn.Linear, nn.LSTM, nn.GRU))
+        and not skip.intersection(name.split("."))
+    }
+    if targets:
+        torch.ao.quantization.quantize_dynamic(
+            model, targets, dtype=torch.qint8, inplace=True
+        )
+    model._int8_layers = len(targets)
+    return model._int8_layers
+
+
+def waveform_to_spec(
+        converter: ToneColorConverter,
+        wav: torch.Tensor,
+        sample_rate: int,
+) -> torch.Tensor:
+    """Resample *wav* to the converter rate and return its linear spectrogram."""
+    hps = converter.hps
+    wav = wav.float().to(converter.device)
+    # STFT / resampling stay in fp32 regardless of any surrounding autocast
+    with torch.autocast(device_type=wav.device.type, enabled=False):
+        if sample_rate != hps.data.sampling_rate:
+            wav = AF.resample(wav, sample_rate, hps.data.sampling_rate)
+        return spectrogram_torch(
+            wav.unsqueeze(0),
+            hps.data.filter_length,
+            hps.data.sampling_rate,
+            hps.data.hop_length,
+            hps.data.win_length,
+            center=False,
+        )
+
+
+def extract_se_from_waveform(
+        converter: ToneColorConverter,
+        wav: torch.Tensor,
+        sample_rate: int,
+) -> torch.Tensor:
+    """Same as `ToneColorConverter.extract_se`, minus the `librosa.load`."""
+    spec = waveform_to_spec(converter, wav, sample_rate)
+    with torch.no_grad():
+        return converter.model.ref_enc(spec.transpose(1, 2)).unsqueeze(-1)
+
+
+def convert_spec(
+        converter: ToneColorConverter,
+        spec: torch.Tensor,
+        src_se: torch.Tensor,
+        tgt_se: torch.Tensor,
+        tau: float = 0.3,
+) -> torch.Tensor:
+    """Run `voice_conversion` on a `(1, F, T)` spectrogram; returns 1-D audio."""
+    spec_lengths = torch.LongTensor([spec.size(-1)]).to(converter.device)
+    with torch.no_grad():
+        audio = converter.model.voice_conversion(
+            spec, spec_lengths, sid_src=src_se, sid_tgt=tgt_se, tau=tau
+        )[0]
+    return audio[0, 0].float()
+
+
+def convert_spec_batch(
+        converter: ToneColorConverter,
+        specs: List[torch.Tensor],
+        src_se: torch.Tensor,
+        tgt_se: torch.Tensor,
+        tau: float = 0.3,
+) -> List[torch.Tensor]:
+    """
+    Run one `voice_conversion` over several `(1, F, T_i)` spectrograms.
+
+    Spectrograms are right-padded into a `(B, F, T)` batch; each output is
+    cut back to `T_i * hop_length` samples.
+    """
+    lengths = [s.size(-1) for s in specs]
+    max_len = max(lengths)
+    batch = torch.cat(
+        [nn.functional.pad(s, (0, max_len - s.size(-1))) for s in specs]
+    )
+    n = batch.size(0)
+    with torch.no_grad():
+        audio = converter.model.voice_conversion(
+            batch,
+            torch.LongTensor(lengths).to(converter.device),
+            sid_src=src_se.expand(n, -1, -1),
+            sid_tgt=tgt_se if tgt_se.size(0) == n else tgt_se.expand(n, -1, -1),
+            tau=tau,
+        )[0][:, 0].float()
+    hop = converter.hps.data.hop_length
+    return [audio[i, :t * hop] for i, t in enumerate(lengths)]
+
+
+def convert_waveform(
+        converter: ToneColorConverter,
+        wav: torch.Tensor,
+        sample_rate: int,
+        src_se: torch.Tensor,
+        tgt_se: torch.Tensor,
+        tau: float = 0.3,
+        message: str = "default",
+) -> np.ndarray:
+    """Same as `ToneColorConverter.convert`, minus the file round-trip."""
+    spec = waveform_to_spec(converter, wav, sample_rate)
+    audio = convert_spec(converter, spec, src_se, tgt_se, tau).cpu().numpy()
+    return converter.add_watermark(audio, message)